@@ -1,41 +1,311 @@
-import json
 import csv
+import gzip
 import os
-import re
-from pathlib import Path
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Number of files handed to each worker process per batch
+PARSE_CHUNKSIZE = 64
+
+# Scraper outputs: one precinct per .json file, or one precinct per line in .ndjson files,
+# optionally gzip-compressed
+JSON_SUFFIXES = ('.json', '.ndjson', '.json.gz', '.ndjson.gz')
+
+# Rows buffered before each writerows() flush
+WRITE_BATCH_SIZE = 1000
+
+# Write buffer for CSV outputs, so rows reach disk in fewer write syscalls
+CSV_BUFFER_SIZE = 1024 * 1024
+
+# Record of converted files (path, mtime, size) used to skip unchanged input on reruns
+MANIFEST_FILE = 'processed_files.manifest'
+
+# Record of files that failed to parse, skipped until they change
+BAD_FILES_FILE = 'bad_files.manifest'
+
+# Column types for Parquet output, fixed up front because the CSVs are read in batches
+# (inference per batch could disagree, and codes would otherwise be inferred as integers)
+PARQUET_STRING_COLUMNS = [
+    'precinct_id', 'machine_id', 'region', 'province', 'municipality', 'barangay',
+    'voting_center', 'precinct_in_cluster', 'contest_code', 'contest_name',
+    'candidate_name', 'party', 'election_level', 'region_code', 'country_region'
+]
+PARQUET_INTEGER_COLUMNS = [
+    'votes', 'over_votes', 'under_votes', 'valid_votes', 'obtained_votes',
+    'registered_voters', 'actual_voters', 'valid_ballots', 'abstentions'
+]
+PARQUET_FLOAT_COLUMNS = ['percentage', 'turnout_percentage', 'total_er_received']
+
+# CSV bytes read per batch when writing Parquet, so large tables never sit in memory whole
+PARQUET_BLOCK_SIZE = 64 * 1024 * 1024
+
+# Parquet datasets partitioned by column, mirroring the region folder layout
+PARQUET_PARTITIONS = {
+    'precincts': ['region'],
+}
+
+# Overseas results shaped like the overseas_results BigQuery table, which
+# gcp_upload_pipeline.py loads directly instead of the CSV
+OVERSEAS_RESULTS_JSONL = 'overseas_results.jsonl.gz'
+OVERSEAS_RESULTS_FIELDS = (
+    'precinct_id', 'contest_code', 'contest_name', 'candidate_name', 'party',
+    'votes', 'percentage', 'country', 'city'
+)
 
 def extract_location_parts(location_str):
     """Extract region, province, municipality, barangay from location string"""
-    parts = [part.strip() for part in location_str.split(',')]
+    # maxsplit=4 keeps a fifth part separate, so barangay is only the fourth part
+    parts = location_str.split(',', 4)
+    while len(parts) < 4:
+        parts.append('')
+    
+    return parts[0].strip(), parts[1].strip(), parts[2].strip(), parts[3].strip()
+
+def split_party_from_name(candidate_name):
+    """Split candidate name into clean name and party affiliation"""
+    if candidate_name.endswith(')'):
+        # Party is the text from the leftmost '(' after the previous ')' up to the final ')'
+        i = candidate_name.find('(', candidate_name.rfind(')', 0, -1) + 1)
+        if 0 <= i < len(candidate_name) - 2:
+            return candidate_name[:i].strip(), candidate_name[i + 1:-1]
+    return candidate_name.strip(), ""
+
+def flatten_contests(contests, election_level, precinct_id, stats_rows, results_rows):
+    """Append contest statistics and candidate result rows for one election level"""
+    append_result = results_rows.append
+    
+    for contest in contests:
+        contest_code = contest.get('contestCode', '')
+        contest_name = contest.get('contestName', '')
+        statistics = contest.get('statistic', {})
+        over_votes = statistics.get('overVotes', 0)
+        under_votes = statistics.get('underVotes', 0)
+        valid_votes = statistics.get('validVotes', 0)
+        obtained_votes = statistics.get('obtainedVotes', 0)
+        
+        # Contest statistics
+        stats_rows.append((
+            precinct_id,
+            contest_code,
+            contest_name,
+            election_level,
+            over_votes,
+            under_votes,
+            valid_votes,
+            obtained_votes
+        ))
+        
+        # Process candidates
+        candidates = contest.get('candidates', {}).get('candidates', [])
+        for candidate in candidates:
+            candidate_name = candidate.get('name', '')
+            clean_name, party = split_party_from_name(candidate_name)
+            
+            append_result((
+                precinct_id,
+                contest_code,
+                contest_name,
+                clean_name,
+                party,
+                candidate.get('votes', 0),
+                candidate.get('percentage', 0.0),
+                election_level,
+                over_votes,
+                under_votes,
+                valid_votes,
+                obtained_votes
+            ))
+
+def iter_json_files(data_dir):
+    """Yield DirEntry objects for all JSON/NDJSON files below data_dir, in os.walk order"""
+    stack = [data_dir]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(JSON_SUFFIXES) and entry.is_file(follow_symlinks=False):
+                    yield entry
+        # Reversed so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+def load_json_records(file_path):
+    """Load the precinct records of a JSON file (one record) or NDJSON file (one per line)"""
+    opener = gzip.open if file_path.endswith('.gz') else open
+    if not file_path.endswith(('.ndjson', '.ndjson.gz')):
+        with opener(file_path, 'rb') as file:
+            return [orjson.loads(file.read())]
     
-    region = parts[0] if len(parts) > 0 else ""
-    province = parts[1] if len(parts) > 1 else ""
-    municipality = parts[2] if len(parts) > 2 else ""
-    barangay = parts[3] if len(parts) > 3 else ""
+    # A damaged line or gzip member costs only those precincts, not the whole file
+    records = []
+    with opener(file_path, 'rb') as file:
+        try:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    print(f"Skipping unreadable line in {file_path}")
+        except (EOFError, OSError, zlib.error) as e:
+            # Everything before the damaged gzip member has been read
+            print(f"Skipping damaged data at the end of {file_path}: {e}")
+    return records
+
+def find_superseded_json_files(file_paths):
+    """Return legacy per-precinct JSON files whose precinct is also in their barangay NDJSON file"""
+    # Legacy files are {location}_{barangay}_{precinct}.json; barangay files are {name}_{barangay}.ndjson.gz
+    ndjson_files = {}
+    for path in file_paths:
+        if path.endswith('.ndjson.gz'):
+            directory, name = os.path.split(path)
+            ndjson_files[(directory, name[:-len('.ndjson.gz')].rsplit('_', 1)[-1])] = path
+    
+    superseded = set()
+    saved_codes = {}
+    for path in file_paths:
+        if not path.endswith('.json'):
+            continue
+        directory, name = os.path.split(path)
+        parts = name[:-len('.json')].rsplit('_', 2)
+        ndjson_path = ndjson_files.get((directory, parts[1])) if len(parts) == 3 else None
+        if ndjson_path is None:
+            continue
+        # Only barangays holding both layouts are read here, once each
+        if ndjson_path not in saved_codes:
+            try:
+                saved_codes[ndjson_path] = {record.get('precinct') for record in load_json_records(ndjson_path)}
+            except Exception:
+                saved_codes[ndjson_path] = set()
+        if parts[2] in saved_codes[ndjson_path]:
+            superseded.add(path)
+    return superseded
+
+def parse_json_file(file_path):
+    """Parse one precinct JSON/NDJSON file into precinct, contest stats and result rows"""
+    try:
+        precinct_rows = []
+        stats_rows = []
+        results_rows = []
+        
+        for data in load_json_records(file_path):
+            # Extract precinct information
+            info = data.get('information', {})
+            precinct_id = info.get('precinctId', '')
+            machine_id = info.get('machineId', '')
+            location = info.get('location', '')
+            voting_center = info.get('votingCenter', '')
+            precinct_in_cluster = info.get('precinctInCluster', '')
+            
+            region, province, municipality, barangay = extract_location_parts(location)
+            
+            precinct_rows.append((
+                precinct_id,
+                machine_id,
+                region,
+                province,
+                municipality,
+                barangay,
+                voting_center,
+                precinct_in_cluster,
+                info.get('numberOfRegisteredVoters', 0),
+                info.get('numberOfActuallyVoters', 0),
+                info.get('numberOfValidBallot', 0),
+                info.get('turnout', 0.0),
+                info.get('abstentions', 0),
+                data.get('totalErReceived', 0.0)
+            ))
+            
+            # Process national and local contests
+            flatten_contests(data.get('national', []), 'national', precinct_id, stats_rows, results_rows)
+            flatten_contests(data.get('local', []), 'local', precinct_id, stats_rows, results_rows)
+        
+        return precinct_rows, stats_rows, results_rows
     
-    return region, province, municipality, barangay
+    except Exception as e:
+        print(f"Error processing {file_path}: {str(e)}")
+        return None
 
-def extract_party_from_name(candidate_name):
-    """Extract party affiliation from candidate name"""
-    match = re.search(r'\(([^)]+)\)$', candidate_name)
-    if match:
-        return match.group(1)
-    return ""
+def load_manifest(manifest_path):
+    """Load the {path: (mtime, size)} manifest of files already converted"""
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', newline='', encoding='utf-8') as f:
+            for path, mtime, size in csv.reader(f):
+                manifest[path] = (float(mtime), int(size))
+    return manifest
 
-def clean_candidate_name(candidate_name):
-    """Remove party affiliation from candidate name"""
-    return re.sub(r'\s*\([^)]+\)$', '', candidate_name).strip()
+def save_manifest(manifest_path, manifest):
+    """Write the {path: (mtime, size)} manifest of converted files"""
+    with open(manifest_path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as f:
+        csv.writer(f).writerows((path, mtime, size) for path, (mtime, size) in manifest.items())
 
 def process_json_files(election_data_dir, output_dir):
-    """Process all JSON files and create CSV datasets"""
+    """Process all JSON files and create CSV datasets; returns whether the CSVs changed"""
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
+    precincts_path = os.path.join(output_dir, 'precincts.csv')
+    results_path = os.path.join(output_dir, 'election_results.csv')
+    stats_path = os.path.join(output_dir, 'contest_stats.csv')
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    bad_files_path = os.path.join(output_dir, BAD_FILES_FILE)
+    
+    # Collect all JSON files up front so they can be parsed in parallel
+    current_files = {}
+    for entry in iter_json_files(election_data_dir):
+        st = entry.stat()
+        # Empty or truncated downloads can't hold a precinct record
+        if st.st_size < 2:
+            continue
+        current_files[entry.path] = (st.st_mtime, st.st_size)
+    
+    # A precinct saved both as a legacy JSON file and in its barangay NDJSON is read once
+    superseded = find_superseded_json_files(current_files)
+    if superseded:
+        print(f"Skipping {len(superseded)} legacy JSON files already in barangay NDJSON files")
+    for path in superseded:
+        del current_files[path]
+    
+    # Skip files that failed to parse before and haven't changed since
+    bad_files = {
+        path: key for path, key in load_manifest(bad_files_path).items()
+        if current_files.get(path) == key
+    }
+    if bad_files:
+        print(f"Skipping {len(bad_files)} files that previously failed to parse")
+    
+    # Only append when every previously converted file is unchanged; otherwise rebuild
+    manifest = load_manifest(manifest_path)
+    incremental = (
+        bool(manifest)
+        and all(current_files.get(path) == key for path, key in manifest.items())
+        and all(os.path.exists(path) for path in (precincts_path, results_path, stats_path))
+    )
+    if incremental:
+        json_files = [path for path in current_files if path not in manifest and path not in bad_files]
+        print(f"Incremental run: {len(json_files)} new files, {len(manifest)} unchanged")
+    else:
+        json_files = [path for path in current_files if path not in bad_files]
+        manifest = {}
+    
+    # Drop the manifest until this run completes so an interrupted run forces a rebuild
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    
     # Initialize CSV files
-    precincts_file = open(os.path.join(output_dir, 'precincts.csv'), 'w', newline='', encoding='utf-8')
-    results_file = open(os.path.join(output_dir, 'election_results.csv'), 'w', newline='', encoding='utf-8')
-    stats_file = open(os.path.join(output_dir, 'contest_stats.csv'), 'w', newline='', encoding='utf-8')
+    mode = 'a' if incremental else 'w'
+    precincts_file = open(precincts_path, mode, newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
+    results_file = open(results_path, mode, newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
+    stats_file = open(stats_path, mode, newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
     
     # Create CSV writers
     precincts_writer = csv.writer(precincts_file)
@@ -43,168 +313,146 @@ def process_json_files(election_data_dir, output_dir):
     stats_writer = csv.writer(stats_file)
     
     # Write headers
-    precincts_writer.writerow([
-        'precinct_id', 'machine_id', 'region', 'province', 'municipality', 
-        'barangay', 'voting_center', 'precinct_in_cluster', 'registered_voters', 
-        'actual_voters', 'valid_ballots', 'turnout_percentage', 'abstentions', 
-        'total_er_received'
-    ])
+    if not incremental:
+        precincts_writer.writerow([
+            'precinct_id', 'machine_id', 'region', 'province', 'municipality', 
+            'barangay', 'voting_center', 'precinct_in_cluster', 'registered_voters', 
+            'actual_voters', 'valid_ballots', 'turnout_percentage', 'abstentions', 
+            'total_er_received'
+        ])
+        
+        results_writer.writerow([
+            'precinct_id', 'contest_code', 'contest_name', 'candidate_name', 
+            'party', 'votes', 'percentage', 'election_level', 'over_votes', 
+            'under_votes', 'valid_votes', 'obtained_votes'
+        ])
+        
+        stats_writer.writerow([
+            'precinct_id', 'contest_code', 'contest_name', 'election_level', 
+            'over_votes', 'under_votes', 'valid_votes', 'obtained_votes'
+        ])
     
-    results_writer.writerow([
-        'precinct_id', 'contest_code', 'contest_name', 'candidate_name', 
-        'party', 'votes', 'percentage', 'election_level', 'over_votes', 
-        'under_votes', 'valid_votes', 'obtained_votes'
-    ])
+    # Parse files across all cores; rows are buffered and written serially here
+    json_files_processed = 0
+    precinct_buf, stats_buf, results_buf = [], [], []
     
-    stats_writer.writerow([
-        'precinct_id', 'contest_code', 'contest_name', 'election_level', 
-        'over_votes', 'under_votes', 'valid_votes', 'obtained_votes'
-    ])
+    def flush_buffers():
+        precincts_writer.writerows(precinct_buf)
+        stats_writer.writerows(stats_buf)
+        results_writer.writerows(results_buf)
+        precinct_buf.clear()
+        stats_buf.clear()
+        results_buf.clear()
     
-    # Process all JSON files
-    json_files_processed = 0
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        parsed_files = executor.map(parse_json_file, json_files, chunksize=PARSE_CHUNKSIZE)
+        for file_path, parsed in zip(json_files, parsed_files):
+            if parsed is None:
+                bad_files[file_path] = current_files[file_path]
+                continue
+            
+            manifest[file_path] = current_files[file_path]
+            precinct_rows, stats_rows, results_rows = parsed
+            precinct_buf.extend(precinct_rows)
+            stats_buf.extend(stats_rows)
+            results_buf.extend(results_rows)
+            
+            if len(results_buf) >= WRITE_BATCH_SIZE:
+                flush_buffers()
+            
+            json_files_processed += 1
+            if json_files_processed % 100 == 0:
+                print(f"Processed {json_files_processed} files...")
     
-    for root, dirs, files in os.walk(election_data_dir):
-        for file in files:
-            if file.endswith('.json'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Extract precinct information
-                    info = data.get('information', {})
-                    precinct_id = info.get('precinctId', '')
-                    machine_id = info.get('machineId', '')
-                    location = info.get('location', '')
-                    voting_center = info.get('votingCenter', '')
-                    precinct_in_cluster = info.get('precinctInCluster', '')
-                    
-                    region, province, municipality, barangay = extract_location_parts(location)
-                    
-                    # Write precinct data
-                    precincts_writer.writerow([
-                        precinct_id,
-                        machine_id,
-                        region,
-                        province,
-                        municipality,
-                        barangay,
-                        voting_center,
-                        precinct_in_cluster,
-                        info.get('numberOfRegisteredVoters', 0),
-                        info.get('numberOfActuallyVoters', 0),
-                        info.get('numberOfValidBallot', 0),
-                        info.get('turnout', 0.0),
-                        info.get('abstentions', 0),
-                        data.get('totalErReceived', 0.0)
-                    ])
-                    
-                    # Process national contests
-                    for contest in data.get('national', []):
-                        contest_code = contest.get('contestCode', '')
-                        contest_name = contest.get('contestName', '')
-                        statistics = contest.get('statistic', {})
-                        
-                        # Write contest statistics
-                        stats_writer.writerow([
-                            precinct_id,
-                            contest_code,
-                            contest_name,
-                            'national',
-                            statistics.get('overVotes', 0),
-                            statistics.get('underVotes', 0),
-                            statistics.get('validVotes', 0),
-                            statistics.get('obtainedVotes', 0)
-                        ])
-                        
-                        # Process candidates
-                        candidates = contest.get('candidates', {}).get('candidates', [])
-                        for candidate in candidates:
-                            candidate_name = candidate.get('name', '')
-                            party = extract_party_from_name(candidate_name)
-                            clean_name = clean_candidate_name(candidate_name)
-                            
-                            results_writer.writerow([
-                                precinct_id,
-                                contest_code,
-                                contest_name,
-                                clean_name,
-                                party,
-                                candidate.get('votes', 0),
-                                candidate.get('percentage', 0.0),
-                                'national',
-                                statistics.get('overVotes', 0),
-                                statistics.get('underVotes', 0),
-                                statistics.get('validVotes', 0),
-                                statistics.get('obtainedVotes', 0)
-                            ])
-                    
-                    # Process local contests
-                    for contest in data.get('local', []):
-                        contest_code = contest.get('contestCode', '')
-                        contest_name = contest.get('contestName', '')
-                        statistics = contest.get('statistic', {})
-                        
-                        # Write contest statistics
-                        stats_writer.writerow([
-                            precinct_id,
-                            contest_code,
-                            contest_name,
-                            'local',
-                            statistics.get('overVotes', 0),
-                            statistics.get('underVotes', 0),
-                            statistics.get('validVotes', 0),
-                            statistics.get('obtainedVotes', 0)
-                        ])
-                        
-                        # Process candidates
-                        candidates = contest.get('candidates', {}).get('candidates', [])
-                        for candidate in candidates:
-                            candidate_name = candidate.get('name', '')
-                            party = extract_party_from_name(candidate_name)
-                            clean_name = clean_candidate_name(candidate_name)
-                            
-                            results_writer.writerow([
-                                precinct_id,
-                                contest_code,
-                                contest_name,
-                                clean_name,
-                                party,
-                                candidate.get('votes', 0),
-                                candidate.get('percentage', 0.0),
-                                'local',
-                                statistics.get('overVotes', 0),
-                                statistics.get('underVotes', 0),
-                                statistics.get('validVotes', 0),
-                                statistics.get('obtainedVotes', 0)
-                            ])
-                    
-                    json_files_processed += 1
-                    if json_files_processed % 100 == 0:
-                        print(f"Processed {json_files_processed} files...")
-                        
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
-                    continue
+    flush_buffers()
     
     # Close files
     precincts_file.close()
     results_file.close()
     stats_file.close()
     
+    save_manifest(manifest_path, manifest)
+    save_manifest(bad_files_path, bad_files)
+    
     print(f"\nCompleted! Processed {json_files_processed} JSON files.")
     print(f"CSV files created in: {output_dir}")
     print("Files created:")
     print("- precincts.csv: Precinct/voting center information")
     print("- election_results.csv: Individual candidate results")
     print("- contest_stats.csv: Contest-level statistics")
+    
+    # An incremental run with no new files leaves the CSVs untouched
+    return not incremental or json_files_processed > 0
+
+def parse_overseas_file(file_path):
+    """Parse one overseas precinct JSON/NDJSON file into CSV rows and overseas_results table rows"""
+    file_name = os.path.basename(file_path)
+    if file_name.endswith(('.ndjson', '.ndjson.gz')):
+        # Country post files are named {country-post}_{code}.ndjson.gz
+        country_region = file_name.rsplit('_', 1)[0]
+    else:
+        country_region = os.path.basename(os.path.dirname(file_path))  # Country/region from folder name
+    
+    try:
+        overseas_rows = []
+        table_rows = []
+        
+        for data in load_json_records(file_path):
+            # Extract overseas information
+            info = data.get('information', {})
+            precinct_id = info.get('precinctId', '')
+            _, _, country, city = extract_location_parts(info.get('location', ''))
+            voting_center = info.get('votingCenter', '')
+            registered_voters = info.get('numberOfRegisteredVoters', 0)
+            actual_voters = info.get('numberOfActuallyVoters', 0)
+            turnout = info.get('turnout', 0.0)
+            
+            # Process contests (similar structure to domestic)
+            for contest in data.get('national', []):
+                contest_code = contest.get('contestCode', '')
+                contest_name = contest.get('contestName', '')
+                
+                candidates = contest.get('candidates', {}).get('candidates', [])
+                for candidate in candidates:
+                    candidate_name = candidate.get('name', '')
+                    clean_name, party = split_party_from_name(candidate_name)
+                    
+                    overseas_rows.append((
+                        'R0OAV00',  # Overseas region code
+                        country_region,
+                        voting_center,
+                        contest_code,
+                        contest_name,
+                        clean_name,
+                        party,
+                        candidate.get('votes', 0),
+                        candidate.get('percentage', 0.0),
+                        registered_voters,
+                        actual_voters,
+                        turnout
+                    ))
+                    table_rows.append((
+                        precinct_id,
+                        contest_code,
+                        contest_name,
+                        clean_name,
+                        party or None,
+                        candidate.get('votes', 0),
+                        candidate.get('percentage', 0.0),
+                        country or country_region,
+                        city
+                    ))
+        
+        return overseas_rows, table_rows
+    
+    except Exception as e:
+        print(f"Error processing overseas file {file_path}: {str(e)}")
+        return None
 
 def process_overseas_data(overseas_data_dir, output_dir):
     """Process overseas election data separately"""
     
-    overseas_file = open(os.path.join(output_dir, 'overseas_results.csv'), 'w', newline='', encoding='utf-8')
+    overseas_file = open(os.path.join(output_dir, 'overseas_results.csv'), 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE)
     overseas_writer = csv.writer(overseas_file)
     
     # Write header
@@ -214,50 +462,87 @@ def process_overseas_data(overseas_data_dir, output_dir):
         'registered_voters', 'actual_voters', 'turnout_percentage'
     ])
     
-    for root, dirs, files in os.walk(overseas_data_dir):
-        for file in files:
-            if file.endswith('.json'):
-                file_path = os.path.join(root, file)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    # Extract overseas information
-                    info = data.get('information', {})
-                    
-                    # Process contests (similar structure to domestic)
-                    for contest in data.get('national', []):
-                        contest_code = contest.get('contestCode', '')
-                        contest_name = contest.get('contestName', '')
-                        
-                        candidates = contest.get('candidates', {}).get('candidates', [])
-                        for candidate in candidates:
-                            candidate_name = candidate.get('name', '')
-                            party = extract_party_from_name(candidate_name)
-                            clean_name = clean_candidate_name(candidate_name)
-                            
-                            overseas_writer.writerow([
-                                'R0OAV00',  # Overseas region code
-                                Path(root).name,  # Country/region from folder name
-                                info.get('votingCenter', ''),
-                                contest_code,
-                                contest_name,
-                                clean_name,
-                                party,
-                                candidate.get('votes', 0),
-                                candidate.get('percentage', 0.0),
-                                info.get('numberOfRegisteredVoters', 0),
-                                info.get('numberOfActuallyVoters', 0),
-                                info.get('turnout', 0.0)
-                            ])
-                            
-                except Exception as e:
-                    print(f"Error processing overseas file {file_path}: {str(e)}")
-                    continue
+    # Rebuilt from every saved precinct on each run, then swapped in whole
+    jsonl_path = os.path.join(output_dir, OVERSEAS_RESULTS_JSONL)
+    jsonl_tmp_path = jsonl_path + '.tmp'
+    jsonl_file = gzip.open(jsonl_tmp_path, 'wb', compresslevel=6)
+    
+    json_files = [entry.path for entry in iter_json_files(overseas_data_dir)]
+    overseas_buf = []
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for parsed in executor.map(parse_overseas_file, json_files, chunksize=PARSE_CHUNKSIZE):
+            if parsed is None:
+                continue
+            
+            overseas_rows, table_rows = parsed
+            jsonl_file.write(b''.join(
+                orjson.dumps(dict(zip(OVERSEAS_RESULTS_FIELDS, row))) + b'\n' for row in table_rows
+            ))
+            overseas_buf.extend(overseas_rows)
+            if len(overseas_buf) >= WRITE_BATCH_SIZE:
+                overseas_writer.writerows(overseas_buf)
+                overseas_buf.clear()
+    
+    overseas_writer.writerows(overseas_buf)
     
     overseas_file.close()
+    jsonl_file.close()
+    os.replace(jsonl_tmp_path, jsonl_path)
     print("- overseas_results.csv: Overseas voting results")
+    print(f"- {OVERSEAS_RESULTS_JSONL}: Overseas results in the BigQuery table's shape")
+
+def write_parquet_datasets(output_dir, datasets):
+    """Write zstd-compressed Parquet copies of the named CSV datasets"""
+    
+    parquet_dir = os.path.join(output_dir, 'parquet')
+    os.makedirs(parquet_dir, exist_ok=True)
+    
+    column_types = {column: pa.string() for column in PARQUET_STRING_COLUMNS}
+    column_types.update({column: pa.int64() for column in PARQUET_INTEGER_COLUMNS})
+    column_types.update({column: pa.float64() for column in PARQUET_FLOAT_COLUMNS})
+    convert_options = pv.ConvertOptions(column_types=column_types)
+    read_options = pv.ReadOptions(block_size=PARQUET_BLOCK_SIZE)
+    
+    for name in datasets:
+        csv_path = os.path.join(output_dir, f'{name}.csv')
+        if not os.path.exists(csv_path):
+            continue
+        
+        # Stream the CSV in batches rather than reading it whole
+        reader = pv.open_csv(csv_path, read_options=read_options, convert_options=convert_options)
+        num_rows = 0
+        partition_cols = PARQUET_PARTITIONS.get(name)
+        
+        if partition_cols:
+            def counted_batches():
+                nonlocal num_rows
+                for batch in reader:
+                    num_rows += batch.num_rows
+                    yield batch
+            
+            ds.write_dataset(
+                counted_batches(),
+                os.path.join(parquet_dir, name),
+                schema=reader.schema,
+                format='parquet',
+                partitioning=partition_cols,
+                partitioning_flavor='hive',
+                file_options=ds.ParquetFileFormat().make_write_options(compression='zstd', use_dictionary=True),
+                existing_data_behavior='delete_matching'
+            )
+        else:
+            with pq.ParquetWriter(
+                os.path.join(parquet_dir, f'{name}.parquet'),
+                reader.schema,
+                compression='zstd',
+                use_dictionary=True
+            ) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    num_rows += batch.num_rows
+        
+        print(f"- parquet/{name}: {num_rows} rows")
 
 if __name__ == "__main__":
     # Set paths
@@ -267,12 +552,21 @@ if __name__ == "__main__":
     
     print("Starting conversion of election data to CSV format...")
     
+    # CSV datasets rewritten or appended to by this run
+    converted = []
+    
     # Process domestic election data
     if os.path.exists(election_data_dir):
-        process_json_files(election_data_dir, output_dir)
+        if process_json_files(election_data_dir, output_dir):
+            converted += ['precincts', 'election_results', 'contest_stats']
     
     # Process overseas election data
     if os.path.exists(overseas_data_dir):
         process_overseas_data(overseas_data_dir, output_dir)
+        converted.append('overseas_results')
+    
+    # Columnar copies for analytics, refreshed only for datasets that changed
+    if converted:
+        write_parquet_datasets(output_dir, converted)
     
     print("\nConversion completed!")
\ No newline at end of file
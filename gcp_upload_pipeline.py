@@ -4,34 +4,69 @@ GCP BigQuery Upload Pipeline for Philippines Election Data
 Uploads CSV datasets to BigQuery with proper schema definitions
 """
 
+import gzip
 import os
+import shutil
 import pandas as pd
-from google.cloud import bigquery
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from google.cloud import bigquery, storage
 from google.cloud.exceptions import NotFound
+from google.cloud.storage import transfer_manager
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Files above this size are uploaded to GCS as parallel chunks
+PARALLEL_UPLOAD_THRESHOLD = 150 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Tables uploaded and loaded concurrently
+MAX_UPLOAD_WORKERS = 8
+
+# Tables convert_to_csv.py also writes as schema-shaped JSON lines next to the CSVs,
+# loaded in place of the CSV
+JSONL_SUFFIX = ".jsonl.gz"
+
+# BigQuery column types as Arrow types for Parquet conversion
+ARROW_TYPES = {
+    "STRING": pa.string(),
+    "INTEGER": pa.int64(),
+    "FLOAT": pa.float64(),
+}
+
+# CSV bytes parsed per Parquet conversion batch, so large tables never sit in memory whole
+PARQUET_BLOCK_SIZE = 64 * 1024 * 1024
+
 class ElectionDataUploader:
-    def __init__(self, project_id: str, dataset_id: str = "philippines_election_2025"):
+    def __init__(self, project_id: str, dataset_id: str = "philippines_election_2025",
+                 staging_bucket: Optional[str] = None, use_parquet: bool = True):
         """
         Initialize the uploader with GCP project and dataset information
         
         Args:
             project_id: GCP project ID
             dataset_id: BigQuery dataset ID
+            staging_bucket: GCS bucket for staging files before loading
+                (defaults to "<project_id>-election-staging")
+            use_parquet: Convert CSVs to Parquet before loading (gzipped CSV otherwise)
         """
         self.project_id = project_id
         self.dataset_id = dataset_id
+        self.staging_bucket = staging_bucket or f"{project_id}-election-staging"
+        self.use_parquet = use_parquet
         self.client = bigquery.Client(project=project_id)
+        self.storage_client = storage.Client(project=project_id)
         self.dataset_ref = self.client.dataset(dataset_id)
         
-    def create_dataset(self):
-        """Create the BigQuery dataset if it doesn't exist"""
+    def create_dataset_and_tables(self):
+        """Create the BigQuery dataset and its tables if they don't exist"""
         try:
             self.client.get_dataset(self.dataset_ref)
             logger.info(f"Dataset {self.dataset_id} already exists")
@@ -41,6 +76,121 @@ class ElectionDataUploader:
             dataset.description = "Philippines 2025 COMELEC Election Data"
             dataset = self.client.create_dataset(dataset)
             logger.info(f"Created dataset {self.dataset_id}")
+        
+        # Tables get their schemas once here, so every load job targets a fixed schema
+        schemas = self.get_table_schemas()
+        for table_name, schema in schemas.items():
+            table = bigquery.Table(self.dataset_ref.table(table_name), schema=schema)
+            self.client.create_table(table, exists_ok=True)
+        logger.info(f"Ensured {len(schemas)} tables in {self.dataset_id}")
+    
+    def create_staging_bucket(self):
+        """Create the GCS staging bucket if it doesn't exist"""
+        if self.storage_client.lookup_bucket(self.staging_bucket) is not None:
+            logger.info(f"Staging bucket {self.staging_bucket} already exists")
+            return
+        
+        self.storage_client.create_bucket(self.staging_bucket, location="US")
+        logger.info(f"Created staging bucket {self.staging_bucket}")
+    
+    def _gzip_file(self, file_path: str) -> str:
+        """
+        Compress a file next to the original for upload
+        
+        Args:
+            file_path: Path to the uncompressed file
+            
+        Returns:
+            Path to the gzipped copy
+        """
+        gz_path = file_path + ".gz"
+        with open(file_path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+        
+        logger.info(f"Compressed {file_path}: {os.path.getsize(file_path)} -> {os.path.getsize(gz_path)} bytes")
+        return gz_path
+    
+    def _csv_to_parquet(self, csv_file_path: str, schema: List[bigquery.SchemaField]) -> str:
+        """
+        Convert a CSV file to a Parquet file typed by the BigQuery schema
+        
+        Args:
+            csv_file_path: Path to the CSV file
+            schema: BigQuery schema for the table
+            
+        Returns:
+            Path to the Parquet file
+        """
+        # Type each column as it is parsed; like the CSV loads, any bad row fails the table
+        convert_options = pv.ConvertOptions(
+            column_types={field.name: ARROW_TYPES.get(field.field_type, pa.string()) for field in schema},
+            strings_can_be_null=True,
+        )
+        try:
+            reader = pv.open_csv(
+                csv_file_path,
+                read_options=pv.ReadOptions(block_size=PARQUET_BLOCK_SIZE),
+                convert_options=convert_options,
+            )
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"{csv_file_path}: {e}") from e
+        
+        # Parquet loads match columns by name, so keep only the schema's columns
+        fields = [field for field in schema if field.name in reader.schema.names]
+        
+        # REQUIRED fields are non-nullable in the file, matching the BigQuery table
+        arrow_schema = pa.schema([
+            pa.field(field.name, ARROW_TYPES.get(field.field_type, pa.string()),
+                     nullable=field.mode != "REQUIRED")
+            for field in fields
+        ])
+        required = [field.name for field in fields if field.mode == "REQUIRED"]
+        
+        parquet_path = str(Path(csv_file_path).with_suffix(".parquet"))
+        num_rows = 0
+        try:
+            with pq.ParquetWriter(parquet_path, arrow_schema, compression="snappy") as writer:
+                for batch in reader:
+                    table = pa.Table.from_batches([batch]).select(arrow_schema.names)
+                    for name in required:
+                        if table[name].null_count:
+                            raise ValueError(f"{csv_file_path} has a null in REQUIRED column {name}")
+                    writer.write_table(table.cast(arrow_schema))
+                    num_rows += table.num_rows
+        except pa.ArrowInvalid as e:
+            os.remove(parquet_path)
+            raise ValueError(f"{csv_file_path}: {e}") from e
+        except ValueError:
+            os.remove(parquet_path)
+            raise
+        
+        logger.info(f"Converted {csv_file_path} to Parquet: {num_rows} rows")
+        return parquet_path
+    
+    def _stage_to_gcs(self, file_path: str) -> str:
+        """
+        Upload a local file to the staging bucket
+        
+        Args:
+            file_path: Path to the local file
+            
+        Returns:
+            gs:// URI of the staged object
+        """
+        blob_name = f"{self.dataset_id}/{Path(file_path).name}"
+        blob = self.storage_client.bucket(self.staging_bucket).blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+        
+        logger.info(f"Staging {file_path} to gs://{self.staging_bucket}/{blob_name}")
+        if os.path.getsize(file_path) > PARALLEL_UPLOAD_THRESHOLD:
+            # Large files go up as concurrent chunks over several connections; threads, not
+            # processes, since this already runs in a worker thread of upload_all_datasets
+            transfer_manager.upload_chunks_concurrently(
+                file_path, blob, chunk_size=UPLOAD_CHUNK_SIZE, worker_type=transfer_manager.THREAD
+            )
+        else:
+            blob.upload_from_filename(file_path)
+        
+        return f"gs://{self.staging_bucket}/{blob_name}"
     
     def get_table_schemas(self) -> Dict[str, List[bigquery.SchemaField]]:
         """Define BigQuery schemas for each table"""
@@ -159,76 +309,186 @@ class ElectionDataUploader:
         }
         return schemas
     
-    def upload_csv_to_bigquery(self, csv_file_path: str, table_name: str, schema: List[bigquery.SchemaField]):
+    def _submit_load_job(self, csv_file_path: str, table_name: str,
+                         schema: List[bigquery.SchemaField]) -> bigquery.LoadJob:
         """
-        Upload a CSV file to BigQuery
+        Convert and stage a CSV file, then start its BigQuery load job without waiting for it
         
         Args:
             csv_file_path: Path to the CSV file
             table_name: Name of the BigQuery table
             schema: BigQuery schema for the table
+            
+        Returns:
+            The running load job
         """
         table_ref = self.dataset_ref.table(table_name)
         
-        # Configure the load job
+        logger.info(f"Starting upload of {csv_file_path} to {table_name}")
+        
+        if csv_file_path.endswith(JSONL_SUFFIX):
+            # Already in the table's shape; stage it untouched
+            return self._submit_jsonl_load_job(self._stage_to_gcs(csv_file_path), table_name, schema)
+        
+        if self.use_parquet and not csv_file_path.endswith(".gz"):
+            # Typed, compressed columns that BigQuery decodes in parallel
+            job_config = bigquery.LoadJobConfig(
+                schema=schema,
+                source_format=bigquery.SourceFormat.PARQUET,
+                write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,  # Overwrite existing data
+            )
+            upload_path = self._csv_to_parquet(csv_file_path, schema)
+        else:
+            # Configure the load job
+            job_config = bigquery.LoadJobConfig(
+                schema=schema,
+                skip_leading_rows=1,  # Skip header row
+                source_format=bigquery.SourceFormat.CSV,
+                write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,  # Overwrite existing data
+                allow_quoted_newlines=True,
+                allow_jagged_rows=False,
+                # Spell out the dialect convert_to_csv.py writes: empty fields are NULL
+                null_marker="",
+                quote_character='"',
+                field_delimiter=",",
+            )
+            # Upload compressed; BigQuery detects gzip from the extension
+            if csv_file_path.endswith(".gz"):
+                upload_path = csv_file_path
+            else:
+                upload_path = self._gzip_file(csv_file_path)
+        # The schema is always explicit; never let BigQuery infer one
+        job_config.autodetect = False
+        
+        # Load from GCS so BigQuery reads the staged object directly
+        try:
+            source_uri = self._stage_to_gcs(upload_path)
+        finally:
+            if upload_path != csv_file_path:
+                os.remove(upload_path)
+        
+        return self.client.load_table_from_uri(
+            source_uri, table_ref, job_config=job_config
+        )
+    
+    def _submit_jsonl_load_job(self, gcs_uri: str, table_name: str,
+                               schema: List[bigquery.SchemaField]) -> bigquery.LoadJob:
+        """Start a BigQuery load job for a staged newline-delimited JSON file"""
         job_config = bigquery.LoadJobConfig(
             schema=schema,
-            skip_leading_rows=1,  # Skip header row
-            source_format=bigquery.SourceFormat.CSV,
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
             write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,  # Overwrite existing data
-            allow_quoted_newlines=True,
-            allow_jagged_rows=False,
-            max_bad_records=100,  # Allow some bad records
+            autodetect=False,
         )
+        return self.client.load_table_from_uri(
+            gcs_uri, self.dataset_ref.table(table_name), job_config=job_config
+        )
+    
+    def _finalize_job(self, job: bigquery.LoadJob, table_name: str):
+        """
+        Wait for a load job to complete and log the result
         
-        logger.info(f"Starting upload of {csv_file_path} to {table_name}")
-        
-        with open(csv_file_path, "rb") as source_file:
-            job = self.client.load_table_from_file(
-                source_file, table_ref, job_config=job_config
-            )
-        
+        Args:
+            job: Load job returned by _submit_load_job
+            table_name: Name of the BigQuery table
+        """
         # Wait for the job to complete
         job.result()
         
         # Get the table info
-        table = self.client.get_table(table_ref)
+        table = self.client.get_table(self.dataset_ref.table(table_name))
         logger.info(f"Loaded {table.num_rows} rows into {table_name}")
         
         if job.errors:
             logger.warning(f"Errors during upload to {table_name}: {job.errors}")
     
+    def upload_csv_to_bigquery(self, csv_file_path: str, table_name: str, schema: List[bigquery.SchemaField]):
+        """
+        Upload a CSV file to BigQuery
+        
+        Args:
+            csv_file_path: Path to the CSV file
+            table_name: Name of the BigQuery table
+            schema: BigQuery schema for the table
+        """
+        job = self._submit_load_job(csv_file_path, table_name, schema)
+        self._finalize_job(job, table_name)
+    
+    def upload_jsonl_to_bigquery(self, gcs_uri: str, table_name: str, schema: List[bigquery.SchemaField]):
+        """
+        Load a newline-delimited JSON file already staged in GCS into BigQuery
+        
+        Args:
+            gcs_uri: gs:// URI of the (optionally gzipped) JSONL file
+            table_name: Name of the BigQuery table
+            schema: BigQuery schema for the table
+        """
+        job = self._submit_jsonl_load_job(gcs_uri, table_name, schema)
+        self._finalize_job(job, table_name)
+    
     def upload_all_datasets(self, csv_dir: str = "./csv_datasets"):
-        """Upload all CSV datasets to BigQuery"""
-        self.create_dataset()
+        """Upload all CSV datasets to BigQuery, preferring converter-written JSONL tables"""
+        self.create_dataset_and_tables()
+        self.create_staging_bucket()
         schemas = self.get_table_schemas()
         csv_path = Path(csv_dir)
         
         # Map CSV files to table names (remove .csv extension)
         csv_files = [f for f in csv_path.glob("*.csv")]
         
+        uploads = {}
         for csv_file in csv_files:
             table_name = csv_file.stem  # filename without extension
             
             if table_name in schemas:
+                uploads[table_name] = csv_file
+            else:
+                logger.warning(f"No schema defined for {table_name}, skipping")
+        
+        # JSONL written by convert_to_csv.py replaces the CSV of the same table
+        for jsonl_file in csv_path.glob(f"*{JSONL_SUFFIX}"):
+            table_name = jsonl_file.name[:-len(JSONL_SUFFIX)]
+            if table_name in schemas:
+                uploads[table_name] = jsonl_file
+        
+        if not uploads:
+            return
+        
+        # Staging mostly waits on the network, so threads overlap the uploads
+        jobs = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_UPLOAD_WORKERS, len(uploads))) as executor:
+            futures = {
+                executor.submit(
+                    self._submit_load_job,
+                    str(csv_file),
+                    table_name,
+                    schemas[table_name]
+                ): table_name
+                for table_name, csv_file in uploads.items()
+            }
+            
+            for future in as_completed(futures):
+                table_name = futures[future]
                 try:
-                    self.upload_csv_to_bigquery(
-                        str(csv_file), 
-                        table_name, 
-                        schemas[table_name]
-                    )
+                    jobs[table_name] = future.result()
                 except Exception as e:
                     logger.error(f"Failed to upload {table_name}: {str(e)}")
-            else:
-                logger.warning(f"No schema defined for {table_name}, skipping")
+        
+        # Load jobs run server-side in parallel; collect their results at the end
+        for table_name, job in jobs.items():
+            try:
+                self._finalize_job(job, table_name)
+            except Exception as e:
+                logger.error(f"Failed to load {table_name}: {str(e)}")
 
 def main():
     """Main function to run the upload pipeline"""
     # Set your GCP project ID here
     PROJECT_ID = "your-gcp-project-id"  # Replace with your actual project ID
+    STAGING_BUCKET = f"{PROJECT_ID}-election-staging"  # GCS bucket for load staging
     
     # Initialize uploader
-    uploader = ElectionDataUploader(PROJECT_ID)
+    uploader = ElectionDataUploader(PROJECT_ID, staging_bucket=STAGING_BUCKET)
     
     # Upload all datasets
     uploader.upload_all_datasets()
@@ -1,12 +1,20 @@
 import asyncio
 import aiohttp
+import gzip
 import json
+import orjson
 import os
+import random
 import time
+import zlib
 import logging
 from datetime import datetime
+from dotenv import load_dotenv
 from pathlib import Path
 
+# Settings from the .env file created by setup_environment.sh; the shell environment wins
+load_dotenv()
+
 # List of regions
 regions = ["R001000", "R002000", "R003000", "R005000", "R006000", "R007000",
            "R008000", "R009000", "R00LAV0", "R00NIR0", "R010000", "R011000",
@@ -15,6 +23,35 @@ regions = ["R001000", "R002000", "R003000", "R005000", "R006000", "R007000",
 # Semaphore to limit concurrent requests (adjust based on server capacity)
 MAX_CONCURRENT_REQUESTS = 10
 
+# Precincts waiting for a worker before enumeration pauses
+PRECINCT_QUEUE_SIZE = MAX_CONCURRENT_REQUESTS * 10
+
+# Global cap on request rate to be nice to the server. The default of 100 matches
+# the old ceiling (10 slots, each sleeping 0.1 s before a request), so the limiter
+# never makes a run slower than before; set REQUESTS_PER_SECOND=0 to disable it
+REQUESTS_PER_SECOND = float(os.environ.get("REQUESTS_PER_SECOND", 100))
+
+# Upper bound in seconds for the retry backoff
+MAX_RETRY_DELAY = 30
+
+class RateLimiter:
+    """Space out requests to enforce a global requests-per-second cap"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def acquire(self):
+        """Wait for the next free request slot"""
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        delay = max(0.0, self.next_slot - now)
+        self.next_slot = max(self.next_slot, now) + self.interval
+        await asyncio.sleep(delay)
+
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
+
 # Set up logging
 def setup_logging():
     log_dir = Path("logs")
@@ -37,26 +74,98 @@ def setup_logging():
     logging.info(f"Starting election data scraping at {datetime.now()}")
     return log_file
 
-async def fetch_json(session, url, retries=3):
+class NdjsonWriter:
+    """Append gzip-compressed JSON lines to the file shared by the precincts of one barangay"""
+
+    def __init__(self, path, pending):
+        self.path = path
+        self.pending = pending
+        self.file = None
+        self.lock = asyncio.Lock()
+
+    async def write(self, record):
+        """Append one record as a JSON line, off the event loop"""
+        line = orjson.dumps(record) + b"\n"
+        # File I/O runs in the default executor (asyncio.to_thread needs Python 3.9)
+        async with self.lock:
+            if self.file is None:
+                # Each writer appends one gzip member; readers see the members as one stream
+                self.file = await asyncio.get_running_loop().run_in_executor(None, gzip.open, self.path, 'ab', 1)
+            await asyncio.get_running_loop().run_in_executor(None, self.file.write, line)
+
+    async def release(self):
+        """Mark one precinct as finished; the last one closes the file"""
+        self.pending -= 1
+        if self.pending == 0:
+            async with self.lock:
+                if self.file is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, self.file.close)
+                    self.file = None
+
+def read_saved_precincts(path):
+    """Return the precinct codes already stored in a barangay NDJSON file"""
+    with gzip.open(path, 'rb') as file:
+        return {orjson.loads(line)["precinct"] for line in file if line.strip()}
+
+def recover_saved_precincts(path):
+    """Rewrite a damaged barangay NDJSON file with its readable lines; the original is kept as .corrupt"""
+    records = []
+    try:
+        with gzip.open(path, 'rb') as file:
+            for line in file:
+                # A line cut off by truncation has no trailing newline
+                if not line.endswith(b"\n") or not line.strip():
+                    continue
+                try:
+                    records.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    continue
+    except (EOFError, OSError, ValueError, zlib.error):
+        # Everything before the damaged gzip member has been read
+        pass
+
+    path.rename(path.with_name(path.name + '.corrupt'))
+    if records:
+        with gzip.open(path, 'wb', compresslevel=1) as file:
+            file.write(b"".join(orjson.dumps(record) + b"\n" for record in records))
+    return {record["precinct"] for record in records if "precinct" in record}
+
+def legacy_saved_precincts(file_names):
+    """Map barangay code to the precinct codes saved as per-precinct JSON files by older runs"""
+    # Older runs wrote {location}_{barangay code}_{precinct code}.json into the city directory
+    legacy_precincts = {}
+    for file_name in file_names:
+        if file_name.endswith('.json'):
+            parts = file_name[:-len('.json')].rsplit('_', 2)
+            if len(parts) == 3:
+                legacy_precincts.setdefault(parts[1], set()).add(parts[2])
+    return legacy_precincts
+
+async def fetch_json(session, semaphore, url, retries=3):
     """Fetch JSON data from URL with retry logic"""
     for attempt in range(retries):
         try:
-            # Add small delay to be nice to the server
-            await asyncio.sleep(0.1)
+            # Wait for the rate limit before taking a concurrency slot, so throttled
+            # requests (and retry backoff below) never hold the semaphore
+            await rate_limiter.acquire()
             
             logging.debug(f"Requesting URL: {url}")
-            async with session.get(url, timeout=10) as response:
-                if response.status == 404:
-                    logging.warning(f"URL not found (404): {url}")
-                    return None
-                    
-                response.raise_for_status()
-                data = await response.json()
-                logging.debug(f"Successfully fetched data from: {url}")
-                return data
+            async with semaphore:
+                async with session.get(url, timeout=10) as response:
+                    if response.status == 404:
+                        logging.warning(f"URL not found (404): {url}")
+                        return None
+                        
+                    response.raise_for_status()
+                    data = await response.json()
+            logging.debug(f"Successfully fetched data from: {url}")
+            return data
                 
         except aiohttp.ClientResponseError as e:
             logging.error(f"HTTP error {e.status} on {url}: {e.message}", exc_info=(attempt == retries-1))
+            # Client errors won't change on retry (except rate limiting)
+            if 400 <= e.status < 500 and e.status != 429:
+                return None
         except aiohttp.ClientError as e:
             logging.error(f"Request failed for {url}: {e}", exc_info=(attempt == retries-1))
         except asyncio.TimeoutError:
@@ -67,114 +176,122 @@ async def fetch_json(session, url, retries=3):
             logging.error(f"Unexpected error accessing {url}: {e}", exc_info=(attempt == retries-1))
             
         if attempt < retries - 1:
-            delay = 1 * (attempt + 1)  # Exponential backoff
-            logging.info(f"Retrying {url} in {delay} seconds (attempt {attempt+1}/{retries})")
+            delay = min(MAX_RETRY_DELAY, 2 ** attempt + random.random())  # Exponential backoff with jitter
+            logging.info(f"Retrying {url} in {delay:.1f} seconds (attempt {attempt+1}/{retries})")
             await asyncio.sleep(delay)
         else:
             logging.error(f"Failed to fetch {url} after {retries} attempts")
             return None
 
-async def process_precinct(session, semaphore, precinct, data_precincts, city_dir, barangay_code, barangay_name, city_name, province_name):
+async def process_precinct(session, semaphore, precinct, data_precincts, barangay_writer, barangay_code, barangay_name, city_name, province_name):
     """Process precinct data"""
-    precinct_code = precinct['code']
+    precinct_code = None
 
-    async with semaphore:
-        try:
-            data_number = precinct_code[:3]
-            url = f"https://2025electionresults.comelec.gov.ph/data/er/{data_number}/{precinct_code}.json"
-            
-            logging.info(f"Fetching data for precinct {precinct_code} in {barangay_name}, {city_name}, {province_name}")
-            data_votes = await fetch_json(session, url)
-
-            if not data_votes:
-                logging.warning(f"No data returned for precinct {precinct_code}")
-                return
-
-            # Validate the expected data structure
-            if "information" not in data_votes or "location" not in data_votes["information"]:
-                logging.warning(f"Invalid data structure for precinct {precinct_code}: missing information or location")
-                return
-
-            # Extract location and get the last part (barangay name)
-            location = data_votes["information"]["location"]
-            location_last_part = location.split(',')[-1].strip().lower().replace(" ", "-")
+    try:
+        # Looked up inside the try so a malformed entry still releases the writer
+        precinct_code = precinct['code']
+        data_number = precinct_code[:3]
+        url = f"https://2025electionresults.comelec.gov.ph/data/er/{data_number}/{precinct_code}.json"
 
-            # Create a unique identifier based on the precinct code
-            precinct_specific_file = f'{city_dir}/{location_last_part}_{barangay_code}_{precinct_code}.json'
+        logging.info(f"Fetching data for precinct {precinct_code} in {barangay_name}, {city_name}, {province_name}")
+        data_votes = await fetch_json(session, semaphore, url)
 
-            # Check if this exact precinct has already been processed
-            if os.path.exists(precinct_specific_file):
-                logging.info(f"Skipping already processed precinct: {precinct_code}")
-                return True
+        if not data_votes:
+            logging.warning(f"No data returned for precinct {precinct_code}")
+            return
 
-            # We'll save with a consistent naming pattern that includes the precinct code
-            with open(precinct_specific_file, 'w', encoding='utf-8') as file:
-                json.dump(data_votes, file, ensure_ascii=False, indent=4)
+        # Validate the expected data structure
+        if "information" not in data_votes or "location" not in data_votes["information"]:
+            logging.warning(f"Invalid data structure for precinct {precinct_code}: missing information or location")
+            return
 
-            logging.info(f"Successfully saved: {precinct_specific_file}")
-            return True
+        # Append one line to the barangay file, tagged with the precinct code for reruns
+        await barangay_writer.write({"precinct": precinct_code, **data_votes})
+
+        logging.info(f"Successfully saved precinct {precinct_code} to {barangay_writer.path}")
+        return True
+
+    except aiohttp.ClientError as e:
+        logging.error(f"Network error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except json.JSONDecodeError as e:
+        logging.error(f"JSON decode error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except IOError as e:
+        logging.error(f"File I/O error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except Exception as e:
+        logging.error(f"Unexpected error processing precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    finally:
+        await barangay_writer.release()
 
-        except aiohttp.ClientError as e:
-            logging.error(f"Network error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
-        except json.JSONDecodeError as e:
-            logging.error(f"JSON decode error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
-        except IOError as e:
-            logging.error(f"File I/O error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
+async def precinct_worker(precinct_queue):
+    """Fetch and save queued precincts until cancelled"""
+    while True:
+        precinct_job = await precinct_queue.get()
+        try:
+            await process_precinct(*precinct_job)
         except Exception as e:
-            logging.error(f"Unexpected error processing precinct {precinct_code}: {e}", exc_info=True)
-            return False
+            # Keep the worker alive; a dead worker would leave put()/join() waiting forever
+            logging.error(f"Unhandled error in precinct worker: {e}", exc_info=True)
+        finally:
+            precinct_queue.task_done()
 
-async def process_barangay(session, semaphore, barangay, city_dir, city_name, province_name):
+async def process_barangay(session, semaphore, precinct_queue, barangay, city_dir, existing_files, legacy_precincts, city_name, province_name):
     """Process barangay data"""
     barangay_code = barangay['code']
     barangay_name = barangay['name']
 
     logging.info(f"Processing the barangay of {barangay_name} in city of {city_name}, {province_name}")
 
-    async with semaphore:
-        try:
-            precinct_number = barangay_code[:2]
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/precinct/{precinct_number}/{barangay_code}.json"
-            data_precincts = await fetch_json(session, url)
+    try:
+        precinct_number = barangay_code[:2]
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/precinct/{precinct_number}/{barangay_code}.json"
+        data_precincts = await fetch_json(session, semaphore, url)
 
-            if not data_precincts:
-                logging.warning(f"No precincts data for barangay {barangay_code}")
-                return
-                
-            # Verify data structure
-            if 'regions' not in data_precincts:
-                logging.warning(f"Missing 'regions' key in data for barangay {barangay_code}")
-                return
-                
-        except Exception as e:
-            logging.error(f"Error fetching precincts for barangay {barangay_code}: {e}", exc_info=True)
+        if not data_precincts:
+            logging.warning(f"No precincts data for barangay {barangay_code}")
             return
 
-    # Process precincts concurrently
-    tasks = []
-    logging.info(f"Found {len(data_precincts['regions'])} precincts in barangay {barangay_name}")
-    
-    for precinct in data_precincts['regions']:
-        task = process_precinct(
-            session, semaphore, precinct, data_precincts, city_dir,
-            barangay_code, barangay_name, city_name, province_name
-        )
-        tasks.append(task)
+        # Verify data structure
+        if 'regions' not in data_precincts:
+            logging.warning(f"Missing 'regions' key in data for barangay {barangay_code}")
+            return
 
-    if tasks:
+    except Exception as e:
+        logging.error(f"Error fetching precincts for barangay {barangay_code}: {e}", exc_info=True)
+        return
+
+    # All precincts of the barangay go into one gzipped NDJSON file
+    barangay_file_name = f"{barangay_name.lower().replace(' ', '-')}_{barangay_code}.ndjson.gz"
+    barangay_file = city_dir / barangay_file_name
+
+    # Skip precincts saved by earlier runs before requesting them, including
+    # per-precinct JSON files left by runs from before the NDJSON layout
+    saved_precincts = set(legacy_precincts.get(barangay_code, ()))
+    if barangay_file_name in existing_files:
         try:
-            # Process up to 5 precincts at a time from each barangay
-            chunk_size = 5
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
-            logging.info(f"Completed processing barangay {barangay_name}")
-        except Exception as e:
-            logging.error(f"Error during concurrent processing of precincts in {barangay_name}: {e}", exc_info=True)
+            saved_precincts |= await asyncio.get_running_loop().run_in_executor(None, read_saved_precincts, barangay_file)
+        except (EOFError, OSError, ValueError, zlib.error) as e:
+            # A run interrupted mid-write leaves a truncated gzip member; keep what is readable and refetch the rest
+            logging.warning(f"Unreadable barangay file {barangay_file} ({e}), salvaging readable lines and refetching the rest")
+            saved_precincts |= await asyncio.get_running_loop().run_in_executor(None, recover_saved_precincts, barangay_file)
+
+    pending = [p for p in data_precincts['regions'] if p['code'] not in saved_precincts]
+    logging.info(f"Found {len(data_precincts['regions'])} precincts in barangay {barangay_name}, {len(pending)} not yet saved")
+
+    # Hand precincts to the worker pool; put() waits while the queue is full
+    barangay_writer = NdjsonWriter(barangay_file, len(pending))
+    for precinct in pending:
+        await precinct_queue.put((
+            session, semaphore, precinct, data_precincts, barangay_writer,
+            barangay_code, barangay_name, city_name, province_name
+        ))
+
+    logging.info(f"Queued precincts of barangay {barangay_name}")
 
-async def process_city(session, semaphore, city, province_dir, province_name, region):
+async def process_city(session, semaphore, precinct_queue, city, province_dir, province_name, region):
     """Process city data"""
     city_code = city['code']
     city_name = city['name']
@@ -186,49 +303,50 @@ async def process_city(session, semaphore, city, province_dir, province_name, re
         city_name_folder = city_name.lower().replace(" ", "-")
         city_dir = province_dir / city_name_folder
         city_dir.mkdir(exist_ok=True)
+
+        # Scan once for barangay files saved by earlier runs instead of a stat per barangay
+        existing_files = {entry.name for entry in os.scandir(city_dir)}
+        legacy_precincts = legacy_saved_precincts(existing_files)
     except Exception as e:
         logging.error(f"Error creating directory for {city_name}: {e}", exc_info=True)
         return
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{city_code}.json"
-            data_barangays = await fetch_json(session, url)
+    try:
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{city_code}.json"
+        data_barangays = await fetch_json(session, semaphore, url)
 
-            if not data_barangays:
-                logging.warning(f"No barangays data for city {city_code}")
-                return
-                
-            # Verify data structure
-            if 'regions' not in data_barangays:
-                logging.warning(f"Missing 'regions' key in data for city {city_code}")
-                return
-                
-            logging.info(f"Found {len(data_barangays['regions'])} barangays in {city_name}")
-            
-        except Exception as e:
-            logging.error(f"Error fetching barangays for city {city_code}: {e}", exc_info=True)
+        if not data_barangays:
+            logging.warning(f"No barangays data for city {city_code}")
+            return
+
+        # Verify data structure
+        if 'regions' not in data_barangays:
+            logging.warning(f"Missing 'regions' key in data for city {city_code}")
             return
 
+        logging.info(f"Found {len(data_barangays['regions'])} barangays in {city_name}")
+
+    except Exception as e:
+        logging.error(f"Error fetching barangays for city {city_code}: {e}", exc_info=True)
+        return
+
     # Process barangays concurrently
     tasks = []
     for barangay in data_barangays['regions']:
         task = process_barangay(
-            session, semaphore, barangay, city_dir, city_name, province_name
+            session, semaphore, precinct_queue, barangay, city_dir, existing_files, legacy_precincts, city_name, province_name
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process barangays in smaller groups to avoid overwhelming
-            chunk_size = 3
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
+            # The semaphore bounds how many requests are in flight
+            await asyncio.gather(*tasks)
             logging.info(f"Completed processing city {city_name}")
         except Exception as e:
             logging.error(f"Error during concurrent processing of barangays in {city_name}: {e}", exc_info=True)
 
-async def process_province(session, semaphore, province, region_dir, region):
+async def process_province(session, semaphore, precinct_queue, province, region_dir, region):
     """Process province data"""
     province_code = province['code']
     province_name = province['name']
@@ -244,45 +362,42 @@ async def process_province(session, semaphore, province, region_dir, region):
         logging.error(f"Error creating directory for {province_name}: {e}", exc_info=True)
         return
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{province_code}.json"
-            data_cities = await fetch_json(session, url)
+    try:
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{province_code}.json"
+        data_cities = await fetch_json(session, semaphore, url)
 
-            if not data_cities:
-                logging.warning(f"No cities data for province {province_code}")
-                return
-                
-            # Verify data structure
-            if 'regions' not in data_cities:
-                logging.warning(f"Missing 'regions' key in data for province {province_code}")
-                return
-                
-            logging.info(f"Found {len(data_cities['regions'])} cities/municipalities in {province_name}")
-            
-        except Exception as e:
-            logging.error(f"Error fetching cities for province {province_code}: {e}", exc_info=True)
+        if not data_cities:
+            logging.warning(f"No cities data for province {province_code}")
+            return
+
+        # Verify data structure
+        if 'regions' not in data_cities:
+            logging.warning(f"Missing 'regions' key in data for province {province_code}")
             return
 
+        logging.info(f"Found {len(data_cities['regions'])} cities/municipalities in {province_name}")
+
+    except Exception as e:
+        logging.error(f"Error fetching cities for province {province_code}: {e}", exc_info=True)
+        return
+
     # Process cities concurrently
     tasks = []
     for city in data_cities['regions']:
         task = process_city(
-            session, semaphore, city, province_dir, province_name, region
+            session, semaphore, precinct_queue, city, province_dir, province_name, region
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process cities in smaller groups (2 at a time) for better control
-            chunk_size = 2
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
+            # The semaphore bounds how many requests are in flight
+            await asyncio.gather(*tasks)
             logging.info(f"Completed processing province {province_name}")
         except Exception as e:
             logging.error(f"Error during concurrent processing of cities in {province_name}: {e}", exc_info=True)
 
-async def process_region(session, semaphore, region, base_dir):
+async def process_region(session, semaphore, precinct_queue, region, base_dir):
     """Process region data"""
     logging.info(f"Processing region: {region}")
 
@@ -294,42 +409,43 @@ async def process_region(session, semaphore, region, base_dir):
         logging.error(f"Error creating directory for region {region}: {e}", exc_info=True)
         return
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{region}.json"
-            data_provinces = await fetch_json(session, url)
+    try:
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/local/{region}.json"
+        data_provinces = await fetch_json(session, semaphore, url)
 
-            if not data_provinces:
-                logging.warning(f"No provinces data for region {region}")
-                return
-                
-            # Verify data structure
-            if 'regions' not in data_provinces:
-                logging.warning(f"Missing 'regions' key in data for region {region}")
-                return
-                
-            logging.info(f"Found {len(data_provinces['regions'])} provinces in region {region}")
-            
-        except Exception as e:
-            logging.error(f"Error fetching provinces for region {region}: {e}", exc_info=True)
+        if not data_provinces:
+            logging.warning(f"No provinces data for region {region}")
+            return
+
+        # Verify data structure
+        if 'regions' not in data_provinces:
+            logging.warning(f"Missing 'regions' key in data for region {region}")
             return
 
-    # Process provinces sequentially for stability
+        logging.info(f"Found {len(data_provinces['regions'])} provinces in region {region}")
+
+    except Exception as e:
+        logging.error(f"Error fetching provinces for region {region}: {e}", exc_info=True)
+        return
+
+    # Process provinces concurrently; the semaphore keeps the request count bounded
     tasks = []
     for province in data_provinces['regions']:
         task = process_province(
-            session, semaphore, province, region_dir, region
+            session, semaphore, precinct_queue, province, region_dir, region
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process one province at a time to avoid overwhelming
-            for task in tasks:
-                await task
+            # A failing province shouldn't cancel its siblings
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for province, result in zip(data_provinces['regions'], results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing province {province['name']} in {region}: {result}", exc_info=result)
             logging.info(f"Completed processing region {region}")
         except Exception as e:
-            logging.error(f"Error during sequential processing of provinces in {region}: {e}", exc_info=True)
+            logging.error(f"Error during concurrent processing of provinces in {region}: {e}", exc_info=True)
 
 async def main():
     """Main function to run the scraper"""
@@ -346,11 +462,34 @@ async def main():
 
     try:
         # Using ClientSession for connection pooling and cookie persistence
-        connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS)
+        # Keep-alive connections and cached DNS avoid a handshake and lookup per request
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=50,
+            ttl_dns_cache=300,
+            use_dns_cache=True,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
         async with aiohttp.ClientSession(connector=connector) as session:
-            # Process regions one at a time for stability
-            for region in regions:
-                await process_region(session, semaphore, region, BASE_DIR)
+            # Precinct fetches run in a fixed worker pool fed while the hierarchy is walked
+            precinct_queue = asyncio.Queue(maxsize=PRECINCT_QUEUE_SIZE)
+            workers = [
+                asyncio.create_task(precinct_worker(precinct_queue))
+                for _ in range(MAX_CONCURRENT_REQUESTS)
+            ]
+
+            try:
+                # Process regions one at a time for stability
+                for region in regions:
+                    await process_region(session, semaphore, precinct_queue, region, BASE_DIR)
+
+                # Wait for the workers to drain the remaining precincts
+                await precinct_queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
                 
         logging.info("Election data scraping completed successfully")
     except Exception as e:
@@ -1,14 +1,28 @@
 import asyncio
-import aiohttp
-import json
+import gzip
+import hashlib
+import httpx
+import orjson
 import os
+import random
 import time
+import zlib
 import logging
 from datetime import datetime
 from pathlib import Path
 
 # Semaphore to limit concurrent requests (adjust based on server capacity)
-MAX_CONCURRENT_REQUESTS = 10
+MAX_CONCURRENT_REQUESTS = 50
+# Upper bound on the backoff between retries, in seconds
+MAX_RETRY_DELAY = 30
+
+# Parent-level listings (groupings, country posts, jurisdictions) rarely change,
+# so re-runs serve them from disk; precinct results are always fetched fresh
+CACHE_DIR = Path("cache/http")
+PARENT_CACHE_TTL = 24 * 60 * 60
+
+# Folder/file name slugs: spaces become hyphens in one str.translate pass
+_SLUG_TRANS = str.maketrans({" ": "-"})
 
 # Set up logging
 def setup_logging():
@@ -32,221 +46,336 @@ def setup_logging():
     logging.info(f"Starting overseas election data scraping at {datetime.now()}")
     return log_file
 
-async def fetch_json(session, url, retries=3):
-    """Fetch JSON data from URL with retry logic"""
+class NdjsonWriter:
+    """Append gzip-compressed JSON lines to a file shared by many precincts"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.lock = asyncio.Lock()
+
+    async def write_lines(self, lines):
+        """Append already-encoded JSON lines"""
+        # File I/O runs in the default executor (asyncio.to_thread needs Python 3.9)
+        async with self.lock:
+            if self.file is None:
+                # Each run appends one gzip member; readers see the members as one stream
+                self.file = await asyncio.get_running_loop().run_in_executor(None, gzip.open, self.path, 'ab', 1)
+            await asyncio.get_running_loop().run_in_executor(None, self.file.write, lines)
+
+    async def close(self):
+        """Close the file if anything was written"""
+        async with self.lock:
+            if self.file is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.file.close)
+                self.file = None
+
+def tag_raw_record(raw, jurisdiction_code, precinct_code):
+    """Return the raw precinct JSON as one NDJSON line, prefixed with its saved keys"""
+    # Raw newlines can only be insignificant whitespace in valid JSON, so dropping
+    # them keeps the response byte-for-byte otherwise and one record per line
+    body = raw.translate(None, b"\r\n").lstrip()
+    return (
+        b'{"jurisdiction":' + orjson.dumps(jurisdiction_code)
+        + b',"precinct":' + orjson.dumps(precinct_code)
+        + b',' + body[1:] + b"\n"
+    )
+
+def recover_saved_precincts(path):
+    """Rewrite a damaged country post NDJSON file with its readable lines; the original is kept as .corrupt"""
+    lines = []
+    saved_precincts = set()
+    try:
+        with gzip.open(path, 'rb') as file:
+            for line in file:
+                # A line cut off by truncation has no trailing newline
+                if not line.endswith(b"\n") or not line.strip():
+                    continue
+                try:
+                    record = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                # Lines are kept byte-for-byte, as the scraper saved them
+                lines.append(line)
+                saved_precincts.add((record.get("jurisdiction"), record["precinct"]))
+    except (EOFError, OSError, ValueError, zlib.error):
+        # Everything before the damaged gzip member has been read
+        pass
+
+    path.rename(path.with_name(path.name + '.corrupt'))
+    if lines:
+        with gzip.open(path, 'wb', compresslevel=1) as file:
+            file.write(b"".join(lines))
+    return saved_precincts
+
+def read_saved_precincts(base_dir):
+    """Return the (jurisdiction, precinct) pairs already saved under base_dir"""
+    saved_precincts = set()
+    # Older runs wrote one {location}_{jurisdiction}_{precinct}.json file per precinct
+    for path in base_dir.rglob("*.json"):
+        parts = path.stem.rsplit('_', 2)
+        if len(parts) == 3:
+            saved_precincts.add((parts[1], parts[2]))
+    for path in base_dir.rglob("*.ndjson.gz"):
+        try:
+            with gzip.open(path, 'rb') as file:
+                records = [orjson.loads(line) for line in file if line.strip()]
+        except (EOFError, OSError, ValueError, zlib.error) as e:
+            # A run interrupted mid-write leaves a truncated gzip member; keep what is readable and refetch the rest
+            logging.warning(f"Unreadable country post file {path} ({e}), salvaging readable lines and refetching the rest")
+            saved_precincts |= recover_saved_precincts(path)
+            continue
+        # Lines from before records carried a jurisdiction become (None, precinct)
+        saved_precincts.update((record.get("jurisdiction"), record["precinct"]) for record in records)
+    return saved_precincts
+
+def is_saved(saved_precincts, jurisdiction_code, precinct_code):
+    """Check a precinct against read_saved_precincts(), including lines without a jurisdiction"""
+    return (jurisdiction_code, precinct_code) in saved_precincts or (None, precinct_code) in saved_precincts
+
+def read_cached(cache_file, ttl):
+    """Return the cached body if it is younger than ttl seconds, else None"""
+    try:
+        if time.time() - cache_file.stat().st_mtime < ttl:
+            return cache_file.read_bytes()
+    except FileNotFoundError:
+        pass
+    return None
+
+def write_cached(cache_file, body):
+    """Write a cache entry atomically so readers never see a partial body"""
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_bytes(body)
+    os.replace(tmp_file, cache_file)
+
+async def fetch_json(session, semaphore, url, retries=3, cache_ttl=None):
+    """Fetch JSON data from URL, served from the on-disk cache when cache_ttl is set"""
+    cache_file = CACHE_DIR / hashlib.sha1(url.encode()).hexdigest() if cache_ttl else None
+    if cache_file:
+        body = await asyncio.get_running_loop().run_in_executor(None, read_cached, cache_file, cache_ttl)
+        if body is not None:
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                # A damaged entry is a miss; the fresh body below replaces it
+                logging.warning(f"Ignoring unreadable cache entry for {url}")
+
+    body = await fetch_raw(session, semaphore, url, retries)
+    if body is None:
+        return None
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        logging.error(f"Invalid JSON from {url}: {e}")
+        return None
+
+    # Only bodies that parsed are cached, so a bad response is refetched next run
+    if cache_file:
+        await asyncio.get_running_loop().run_in_executor(None, write_cached, cache_file, body)
+    return data
+
+async def fetch_raw(session, semaphore, url, retries=3):
+    """Fetch the raw response body from URL with retry logic"""
     for attempt in range(retries):
         try:
-            # Add small delay to be nice to the server
-            await asyncio.sleep(0.1)
-            async with session.get(url, timeout=10) as response:
-                response.raise_for_status()
-                return await response.json()
-        except aiohttp.ClientResponseError as e:
-            logging.error(f"HTTP error {e.status} on {url}: {e.message}", exc_info=(attempt == retries-1))
-        except aiohttp.ClientError as e:
-            logging.error(f"Request failed for {url}: {e}", exc_info=(attempt == retries-1))
-        except asyncio.TimeoutError:
+            # Hold a slot only for the request itself, not for parsing,
+            # file writes or retry backoff
+            async with semaphore:
+                response = await session.get(url)
+            response.raise_for_status()
+            return response.content
+        except httpx.HTTPStatusError as e:
+            logging.error(f"HTTP error {e.response.status_code} on {url}: {e.response.reason_phrase}", exc_info=(attempt == retries-1))
+        except httpx.TimeoutException:
             logging.error(f"Request timeout for {url}", exc_info=(attempt == retries-1))
+        except httpx.HTTPError as e:
+            logging.error(f"Request failed for {url}: {e}", exc_info=(attempt == retries-1))
         except Exception as e:
             logging.error(f"Unexpected error accessing {url}: {e}", exc_info=(attempt == retries-1))
             
         if attempt < retries - 1:
-            delay = 1 * (attempt + 1)  # Exponential backoff
-            logging.info(f"Retrying {url} in {delay} seconds (attempt {attempt+1}/{retries})")
+            delay = min(MAX_RETRY_DELAY, 2 ** attempt + random.random())  # Exponential backoff with jitter
+            logging.info(f"Retrying {url} in {delay:.1f} seconds (attempt {attempt+1}/{retries})")
             await asyncio.sleep(delay)
         else:
             logging.error(f"Failed to fetch {url} after {retries} attempts")
             return None
 
-async def process_precinct(session, semaphore, precinct, data_precincts, city_dir, jurisdiction_code, jurisdiction_name, city_name, province_name):
+async def process_precinct(session, semaphore, precinct, data_precincts, country_post_writer, saved_precincts, jurisdiction_code, jurisdiction_name, city_name, province_name):
     """Process precinct data"""
     precinct_code = precinct['code']
 
-    async with semaphore:
-        try:
-            data_number = precinct_code[:3]
-            url = f"https://2025electionresults.comelec.gov.ph/data/er/{data_number}/{precinct_code}.json"
-            
-            logging.info(f"Fetching data for precinct {precinct_code} in {jurisdiction_name}, {city_name}, {province_name}")
-            data_votes = await fetch_json(session, url)
-
-            if not data_votes:
-                logging.warning(f"No data returned for precinct {precinct_code}")
-                return
-
-            # Validate the expected data structure
-            if "information" not in data_votes or "location" not in data_votes["information"]:
-                logging.warning(f"Invalid data structure for precinct {precinct_code}: missing information or location")
-                return
-
-            # Extract location and get the last part (jurisdiction name)
-            location = data_votes["information"]["location"]
-            location_last_part = location.split(',')[-1].strip().lower().replace(" ", "-")
-
-            # Create a unique identifier based on the precinct code
-            precinct_specific_file = f'{city_dir}/{location_last_part}_{jurisdiction_code}_{precinct_code}.json'
-
-            # Check if this exact precinct has already been processed
-            if os.path.exists(precinct_specific_file):
-                logging.info(f"Skipping already processed precinct: {precinct_code}")
-                return True
-
-            # We'll save with a consistent naming pattern that includes the precinct code
-            with open(precinct_specific_file, 'w', encoding='utf-8') as file:
-                json.dump(data_votes, file, ensure_ascii=False, indent=4)
-
-            logging.info(f"Successfully saved: {precinct_specific_file}")
-            return True
-
-        except aiohttp.ClientError as e:
-            # Network-related errors
-            logging.error(f"Network error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
-        except json.JSONDecodeError as e:
-            # JSON parsing errors
-            logging.error(f"JSON decode error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
-        except IOError as e:
-            # File I/O errors
-            logging.error(f"File I/O error for precinct {precinct_code}: {e}", exc_info=True)
-            return False
-        except Exception as e:
-            # Catch-all for other errors
-            logging.error(f"Unexpected error processing precinct {precinct_code}: {e}", exc_info=True)
-            return False
+    # Skip precincts saved by earlier runs before requesting them
+    if is_saved(saved_precincts, jurisdiction_code, precinct_code):
+        logging.info(f"Skipping already processed precinct: {precinct_code}")
+        return True
+
+    try:
+        data_number = precinct_code[:3]
+        url = f"https://2025electionresults.comelec.gov.ph/data/er/{data_number}/{precinct_code}.json"
+
+        logging.info(f"Fetching data for precinct {precinct_code} in {jurisdiction_name}, {city_name}, {province_name}")
+        raw_votes = await fetch_raw(session, semaphore, url)
 
-async def process_jurisdiction(session, semaphore, jurisdiction, city_dir, city_name, province_name):
+        if not raw_votes:
+            logging.warning(f"No data returned for precinct {precinct_code}")
+            return
+
+        # Parsed only to validate the structure; the raw bytes are what gets saved
+        data_votes = orjson.loads(raw_votes)
+
+        # Validate the expected data structure
+        if "information" not in data_votes or "location" not in data_votes["information"]:
+            logging.warning(f"Invalid data structure for precinct {precinct_code}: missing information or location")
+            return
+
+        # One line per precinct in the country post's NDJSON file: the response bytes, tagged with their keys
+        await country_post_writer.write_lines(tag_raw_record(raw_votes, jurisdiction_code, precinct_code))
+
+        logging.info(f"Successfully saved precinct {precinct_code} to {country_post_writer.path}")
+        return True
+
+    except httpx.HTTPError as e:
+        # Network-related errors
+        logging.error(f"Network error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except orjson.JSONDecodeError as e:
+        # JSON parsing errors
+        logging.error(f"JSON decode error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except IOError as e:
+        # File I/O errors
+        logging.error(f"File I/O error for precinct {precinct_code}: {e}", exc_info=True)
+        return False
+    except Exception as e:
+        # Catch-all for other errors
+        logging.error(f"Unexpected error processing precinct {precinct_code}: {e}", exc_info=True)
+        return False
+
+async def process_jurisdiction(session, semaphore, jurisdiction, country_post_writer, saved_precincts, city_name, province_name):
     """Process jurisdiction data"""
     jurisdiction_code = jurisdiction['code']
     jurisdiction_name = jurisdiction['name']
 
     logging.info(f"Processing the jurisdiction of {jurisdiction_name} in {city_name}, {province_name}")
 
-    async with semaphore:
-        try:
-            precinct_number = jurisdiction_code[:2]
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/precinct/{precinct_number}/{jurisdiction_code}.json"
-            data_precincts = await fetch_json(session, url)
+    try:
+        precinct_number = jurisdiction_code[:2]
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/precinct/{precinct_number}/{jurisdiction_code}.json"
+        data_precincts = await fetch_json(session, semaphore, url, cache_ttl=PARENT_CACHE_TTL)
 
-            if not data_precincts:
-                logging.warning(f"No precincts data for jurisdiction {jurisdiction_code}")
-                return
-        except Exception as e:
-            logging.error(f"Error fetching precincts for jurisdiction {jurisdiction_code}: {e}", exc_info=True)
+        if not data_precincts:
+            logging.warning(f"No precincts data for jurisdiction {jurisdiction_code}")
             return
+    except Exception as e:
+        logging.error(f"Error fetching precincts for jurisdiction {jurisdiction_code}: {e}", exc_info=True)
+        return
 
     # Process precincts concurrently
     tasks = []
     for precinct in data_precincts['regions']:
         task = process_precinct(
-            session, semaphore, precinct, data_precincts, city_dir,
+            session, semaphore, precinct, data_precincts, country_post_writer, saved_precincts,
             jurisdiction_code, jurisdiction_name, city_name, province_name
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process up to 5 precincts at a time from each jurisdiction
-            chunk_size = 5
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
+            # The shared semaphore is the only throttle; a failing precinct
+            # shouldn't cancel its siblings
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for precinct, result in zip(data_precincts['regions'], results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing precinct {precinct['code']} in {jurisdiction_name}: {result}", exc_info=result)
             logging.info(f"Completed processing jurisdiction {jurisdiction_name}")
         except Exception as e:
             logging.error(f"Error during concurrent processing of precincts in {jurisdiction_name}: {e}", exc_info=True)
 
-async def process_country_post(session, semaphore, country_post, regional_grouping_dir, regional_grouping_name, overseas):
+async def process_country_post(session, semaphore, country_post, regional_grouping_dir, saved_precincts, regional_grouping_name, overseas):
     """Process country post data"""
     country_post_code = country_post['code']
     country_post_name = country_post['name']
 
     logging.info(f"Processing the country post of {country_post_name} in {regional_grouping_name}")
 
-    try:
-        # Create country_post directory
-        country_post_name_folder = country_post_name.lower().replace(" ", "-")
-        country_post_dir = regional_grouping_dir / country_post_name_folder
-        country_post_dir.mkdir(exist_ok=True)
-    except Exception as e:
-        logging.error(f"Error creating directory for {country_post_name}: {e}", exc_info=True)
-        return
+    # All precincts of the country post go into one gzipped NDJSON file
+    country_post_file_name = f"{country_post_name.lower().translate(_SLUG_TRANS)}_{country_post_code}.ndjson.gz"
+    country_post_file = regional_grouping_dir / country_post_file_name
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{country_post_code}.json"
-            data_jurisdictions = await fetch_json(session, url)
+    try:
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{country_post_code}.json"
+        data_jurisdictions = await fetch_json(session, semaphore, url, cache_ttl=PARENT_CACHE_TTL)
 
-            if not data_jurisdictions:
-                logging.warning(f"No jurisdictions data for country post {country_post_code}")
-                return
-        except Exception as e:
-            logging.error(f"Error fetching jurisdictions for country post {country_post_code}: {e}", exc_info=True)
+        if not data_jurisdictions:
+            logging.warning(f"No jurisdictions data for country post {country_post_code}")
             return
+    except Exception as e:
+        logging.error(f"Error fetching jurisdictions for country post {country_post_code}: {e}", exc_info=True)
+        return
 
     # Process jurisdictions concurrently
+    country_post_writer = NdjsonWriter(country_post_file)
     tasks = []
     for jurisdiction in data_jurisdictions['regions']:
         task = process_jurisdiction(
-            session, semaphore, jurisdiction, country_post_dir, country_post_name, regional_grouping_name
+            session, semaphore, jurisdiction, country_post_writer, saved_precincts, country_post_name, regional_grouping_name
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process jurisdictions in smaller groups to avoid overwhelming
-            chunk_size = 3
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for jurisdiction, result in zip(data_jurisdictions['regions'], results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing jurisdiction {jurisdiction['name']} in {country_post_name}: {result}", exc_info=result)
             logging.info(f"Completed processing country post {country_post_name}")
         except Exception as e:
             logging.error(f"Error during concurrent processing of jurisdictions in {country_post_name}: {e}", exc_info=True)
+        finally:
+            await country_post_writer.close()
 
-async def process_regional_grouping(session, semaphore, regional_grouping, region_dir, region):
-    """Process regional grouping data"""
+async def fetch_country_posts(session, semaphore, regional_grouping):
+    """Fetch the country post listing of a regional grouping"""
     regional_grouping_code = regional_grouping['code']
-    regional_grouping_name = regional_grouping['name']
-
-    logging.info(f"Processing the regional grouping of {regional_grouping_name}")
 
     try:
-        # Create regional_grouping directory
-        regional_grouping_name_folder = regional_grouping_name.lower().replace(" ", "-")
-        regional_grouping_dir = region_dir / regional_grouping_name_folder
-        regional_grouping_dir.mkdir(exist_ok=True)
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{regional_grouping_code}.json"
+        data_countries_posts = await fetch_json(session, semaphore, url, cache_ttl=PARENT_CACHE_TTL)
+
+        if not data_countries_posts:
+            logging.warning(f"No country posts data for regional grouping {regional_grouping_code}")
+            return None
+        return data_countries_posts
     except Exception as e:
-        logging.error(f"Error creating directory for {regional_grouping_name}: {e}", exc_info=True)
-        return
+        logging.error(f"Error fetching country posts for regional grouping {regional_grouping_code}: {e}", exc_info=True)
+        return None
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{regional_grouping_code}.json"
-            data_countries_posts = await fetch_json(session, url)
+async def process_regional_grouping(session, semaphore, regional_grouping, data_countries_posts, regional_grouping_dir, saved_precincts, region):
+    """Process regional grouping data"""
+    regional_grouping_name = regional_grouping['name']
 
-            if not data_countries_posts:
-                logging.warning(f"No country posts data for regional grouping {regional_grouping_code}")
-                return
-        except Exception as e:
-            logging.error(f"Error fetching country posts for regional grouping {regional_grouping_code}: {e}", exc_info=True)
-            return
+    logging.info(f"Processing the regional grouping of {regional_grouping_name}")
 
     # Process country posts concurrently
     tasks = []
     for country_post in data_countries_posts['regions']:
         task = process_country_post(
-            session, semaphore, country_post, regional_grouping_dir, regional_grouping_name, region
+            session, semaphore, country_post, regional_grouping_dir, saved_precincts, regional_grouping_name, region
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process country posts in smaller groups for better control
-            chunk_size = 2
-            for i in range(0, len(tasks), chunk_size):
-                await asyncio.gather(*tasks[i:i+chunk_size])
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for country_post, result in zip(data_countries_posts['regions'], results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing country post {country_post['name']} in {regional_grouping_name}: {result}", exc_info=result)
             logging.info(f"Completed processing regional grouping {regional_grouping_name}")
         except Exception as e:
             logging.error(f"Error during concurrent processing of country posts in {regional_grouping_name}: {e}", exc_info=True)
 
-async def process_overseas(session, semaphore, overseas, base_dir):
+async def process_overseas(session, semaphore, overseas, base_dir, saved_precincts):
     """Process overseas data"""
     logging.info(f"Processing overseas region: {overseas}")
 
@@ -258,34 +387,56 @@ async def process_overseas(session, semaphore, overseas, base_dir):
         logging.error(f"Error creating directory for overseas {overseas}: {e}", exc_info=True)
         return
 
-    async with semaphore:
-        try:
-            url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{overseas}.json"
-            data_regional_groupings = await fetch_json(session, url)
+    try:
+        url = f"https://2025electionresults.comelec.gov.ph/data/regions/overseas/{overseas}.json"
+        data_regional_groupings = await fetch_json(session, semaphore, url, cache_ttl=PARENT_CACHE_TTL)
 
-            if not data_regional_groupings:
-                logging.warning(f"No regional groupings data for overseas {overseas}")
-                return
-        except Exception as e:
-            logging.error(f"Error fetching regional groupings for overseas {overseas}: {e}", exc_info=True)
+        if not data_regional_groupings:
+            logging.warning(f"No regional groupings data for overseas {overseas}")
             return
+    except Exception as e:
+        logging.error(f"Error fetching regional groupings for overseas {overseas}: {e}", exc_info=True)
+        return
 
-    # Process regional groupings sequentially for stability
+    # Fetch every country post listing first so the whole directory layout is known
+    regional_groupings = data_regional_groupings['regions']
+    listings = await asyncio.gather(
+        *(fetch_country_posts(session, semaphore, regional_grouping) for regional_grouping in regional_groupings)
+    )
+
+    # Create all directories in one pass instead of a mkdir per task in the hot path
+    layout = []
+    dirs = set()
+    for regional_grouping, data_countries_posts in zip(regional_groupings, listings):
+        if not data_countries_posts:
+            continue
+        regional_grouping_dir = overseas_dir / regional_grouping['name'].lower().translate(_SLUG_TRANS)
+        layout.append((regional_grouping, data_countries_posts, regional_grouping_dir))
+        dirs.add(regional_grouping_dir)
+    try:
+        for directory in sorted(dirs):
+            directory.mkdir(parents=True, exist_ok=True)
+    except Exception as e:
+        logging.error(f"Error creating directories for overseas {overseas}: {e}", exc_info=True)
+        return
+
+    # Process regional groupings concurrently
     tasks = []
-    for regional_grouping in data_regional_groupings['regions']:
+    for regional_grouping, data_countries_posts, regional_grouping_dir in layout:
         task = process_regional_grouping(
-            session, semaphore, regional_grouping, overseas_dir, overseas
+            session, semaphore, regional_grouping, data_countries_posts, regional_grouping_dir, saved_precincts, overseas
         )
         tasks.append(task)
 
     if tasks:
         try:
-            # Process one regional grouping at a time to avoid overwhelming
-            for task in tasks:
-                await task
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for (regional_grouping, _, _), result in zip(layout, results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing regional grouping {regional_grouping['name']} in {overseas}: {result}", exc_info=result)
             logging.info(f"Completed processing overseas {overseas}")
         except Exception as e:
-            logging.error(f"Error during sequential processing of regional groupings in {overseas}: {e}", exc_info=True)
+            logging.error(f"Error during concurrent processing of regional groupings in {overseas}: {e}", exc_info=True)
 
 async def main():
     """Main function to run the scraper"""
@@ -295,16 +446,23 @@ async def main():
     
     BASE_DIR = Path("election_data_overseas")
     BASE_DIR.mkdir(exist_ok=True)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
     # Create semaphore to limit concurrent requests
     semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
     try:
-        # Using ClientSession for connection pooling and cookie persistence
-        async with aiohttp.ClientSession() as session:
+        # Read every saved precinct once so already-done precincts are never requested
+        saved_precincts = await asyncio.get_running_loop().run_in_executor(None, read_saved_precincts, BASE_DIR)
+        logging.info(f"Found {len(saved_precincts)} precincts saved by earlier runs")
+
+        # Every request goes to one static host, so HTTP/2 multiplexes them
+        # over a few long-lived TLS connections instead of one per request
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        async with httpx.AsyncClient(http2=True, limits=limits, timeout=15) as session:
             # Process overseas
             overseas = "R0OAV00"
-            await process_overseas(session, semaphore, overseas, BASE_DIR)
+            await process_overseas(session, semaphore, overseas, BASE_DIR, saved_precincts)
             
         logging.info("Overseas election data scraping completed successfully")
     except Exception as e:
@@ -313,8 +471,17 @@ async def main():
         logging.info(f"Overseas election data scraping process ended at {datetime.now()}")
 
 if __name__ == "__main__":
+    # uvloop is optional (and unavailable on Windows); fall back to the default loop
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
     start_time = time.time()
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
     end_time = time.time()
     total_time = end_time - start_time
     print(f"Total execution time: {total_time:.2f} seconds ({total_time/60:.2f} minutes)")
\ No newline at end of file
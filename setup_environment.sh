@@ -110,6 +110,7 @@ GOOGLE_APPLICATION_CREDENTIALS=./gcp-credentials/service-account-key.json
 
 # Data Collection Settings
 MAX_CONCURRENT_REQUESTS=10
+REQUESTS_PER_SECOND=100
 DATA_OUTPUT_DIR=./election_data
 LOGS_DIR=./logs
 